@@ -0,0 +1,67 @@
+"""
+Autonomous agent endpoints
+"""
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Dict, Any
+from functools import lru_cache
+import logging
+
+import runtime
+from routers.common import APIRequest, openai_exc_to_http, verify_api_key
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Imported on first use so agent tooling stays off the cold-start path
+@lru_cache(maxsize=1)
+def _agent_factory():
+    from services.agent_service import create_agent
+    return create_agent
+
+class AgentRequest(APIRequest):
+    task: str
+    agent_type: Annotated[str, Field(pattern="^(general|researcher|analyst)$")] = "general"
+    max_iterations: Annotated[int, Field(ge=1, le=20)] = 10
+    # 0 makes the agent deterministic, so repeated runs are served from cache
+    temperature: Annotated[float, Field(ge=0, le=2)] = 0.7
+
+class AgentResponse(BaseModel):
+    answer: str
+    iterations: int
+    execution_trace: List[Dict[str, Any]]
+    usage: Dict[str, int] | None = None
+    cache: Dict[str, int] | None = None
+
+@router.post("/agent/run", responses={200: {"model": AgentResponse}})
+async def run_agent(
+    request: AgentRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Run an autonomous AI agent on a task
+    """
+    try:
+        # Create agent
+        agent = _agent_factory()(
+            agent_type=request.agent_type,
+            client=runtime.openai_client,
+            temperature=request.temperature
+        )
+        agent.max_iterations = request.max_iterations
+        
+        # Run agent
+        result = await agent.run(request.task)
+        
+        return AgentResponse(
+            answer=result["answer"],
+            iterations=result["iterations"],
+            execution_trace=result["execution_trace"],
+            usage=result.get("usage"),
+            cache=result.get("cache")
+        )
+    except Exception as e:
+        logger.exception("Agent execution error")
+        raise openai_exc_to_http(e) from e
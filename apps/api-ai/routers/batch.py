@@ -0,0 +1,176 @@
+"""
+Batch processing endpoint
+"""
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel, Field, RootModel
+from typing import Annotated, List, Dict, Any, Literal, Union
+import asyncio
+import logging
+import openai
+
+import runtime
+from config import settings
+from routers.chat import (
+    ChatRequest,
+    CompletionRequest,
+    EmbeddingRequest,
+    EmbeddingResponse,
+    chat_completion,
+    text_completion,
+)
+from routers.common import APIRequest, openai_exc_to_http, token_usage, verify_api_key
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+class ChatBatchRequest(APIRequest):
+    endpoint: Literal["chat"]
+    requests: List[ChatRequest]
+
+class CompletionBatchRequest(APIRequest):
+    endpoint: Literal["completions"]
+    requests: List[CompletionRequest]
+
+class EmbeddingBatchRequest(APIRequest):
+    endpoint: Literal["embeddings"]
+    requests: List[EmbeddingRequest]
+
+class BatchRequest(RootModel):
+    """Batch body, tagged on `endpoint` so items are validated once against one type"""
+    root: Annotated[
+        Union[ChatBatchRequest, CompletionBatchRequest, EmbeddingBatchRequest],
+        Field(discriminator="endpoint")
+    ]
+
+class BatchResponse(BaseModel):
+    results: List[Dict[str, Any]]
+    total: int
+    successful: int
+    failed: int
+
+# Most inputs the embeddings API accepts in one call
+MAX_EMBEDDING_INPUTS = 2048
+
+def _embedding_groups(requests: List[EmbeddingRequest]) -> List[tuple]:
+    """
+    Pack requests into upstream calls of one model and at most
+    MAX_EMBEDDING_INPUTS inputs, never splitting a request across calls
+    
+    Returns (model, [(request index, inputs)]) per call.
+    """
+    groups: List[tuple] = []
+    # Index in groups, and input count, of the call each model is filling
+    filling: Dict[str, tuple] = {}
+    
+    for i, req in enumerate(requests):
+        inputs = [req.input] if isinstance(req.input, str) else req.input
+        g, count = filling.get(req.model, (None, 0))
+        if g is None or count + len(inputs) > MAX_EMBEDDING_INPUTS:
+            g, count = len(groups), 0
+            groups.append((req.model, []))
+        groups[g][1].append((i, inputs))
+        filling[req.model] = (g, count + len(inputs))
+    
+    return groups
+
+async def _coalesce_embeddings(
+    requests: List[EmbeddingRequest],
+    semaphore: asyncio.Semaphore
+) -> List[Any]:
+    """
+    Serve a batch of embedding requests with as few upstream calls as possible
+    
+    Returns an EmbeddingResponse, or the exception raised for it, per request
+    in request order. Usage of each upstream call is reported on the first
+    request of its group so totals across the batch stay exact. A group the
+    provider rejects is retried request by request, so one bad input only
+    fails its own request.
+    """
+    results: List[Any] = [None] * len(requests)
+    
+    async def embed(model: str, inputs: List[str]):
+        async with semaphore:
+            return await runtime.openai_client.embeddings.create(model=model, input=inputs)
+    
+    async def serve(model: str, members: List[tuple]):
+        flat = [text for _, inputs in members for text in inputs]
+        try:
+            response = await embed(model, flat)
+        except openai.BadRequestError as e:
+            if len(members) == 1:
+                results[members[0][0]] = e
+                return
+            await asyncio.gather(*(serve(model, [member]) for member in members))
+            return
+        except Exception as e:
+            logger.error("Batch embeddings error for %s: %s", model, e)
+            for i, _ in members:
+                results[i] = e
+            return
+        
+        embeddings = [item.embedding for item in response.data]
+        usage = token_usage(response.usage)
+        
+        start = 0
+        for n, (i, inputs) in enumerate(members):
+            results[i] = EmbeddingResponse(
+                embeddings=embeddings[start:start + len(inputs)],
+                model=response.model,
+                usage=usage if n == 0 else {"prompt_tokens": 0, "total_tokens": 0}
+            )
+            start += len(inputs)
+    
+    await asyncio.gather(*(serve(model, members) for model, members in _embedding_groups(requests)))
+    return results
+
+@router.post("/batch", responses={200: {"model": BatchResponse}})
+async def batch_process(
+    request: BatchRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Process multiple requests in batch
+    """
+    batch = request.root
+    
+    # Bound upstream fan-out so one large batch cannot exhaust the OpenAI quota
+    semaphore = asyncio.Semaphore(settings.batch_concurrency)
+    
+    if batch.endpoint == "embeddings":
+        # The embeddings API accepts many inputs per call, so coalesce instead
+        raw_results = await _coalesce_embeddings(batch.requests, semaphore)
+    else:
+        handler = chat_completion if batch.endpoint == "chat" else text_completion
+        
+        async def dispatch(req):
+            async with semaphore:
+                return await handler(req, api_key)
+        
+        raw_results = await asyncio.gather(
+            *(dispatch(req) for req in batch.requests),
+            return_exceptions=True
+        )
+    
+    results = []
+    successful = 0
+    failed = 0
+    
+    for result in raw_results:
+        if isinstance(result, Exception):
+            # Same static details as the single-request endpoints; upstream
+            # error text is not passed through
+            error = openai_exc_to_http(result)
+            results.append({"status": "error", "error": error.detail, "status_code": error.status_code})
+            failed += 1
+        else:
+            results.append({"status": "success", "data": result.model_dump()})
+            successful += 1
+    
+    return BatchResponse(
+        results=results,
+        total=len(batch.requests),
+        successful=successful,
+        failed=failed
+    )
@@ -0,0 +1,149 @@
+"""
+Chat, completion and embedding endpoints
+"""
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Dict
+import logging
+
+import runtime
+from routers.common import (
+    APIRequest,
+    ChatMessage,
+    openai_exc_to_http,
+    openai_messages,
+    token_usage,
+    verify_api_key,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+class ChatRequest(APIRequest):
+    messages: List[ChatMessage]
+    model: str = "gpt-4.1-mini"
+    temperature: Annotated[float, Field(ge=0, le=2)] = 0.7
+    max_tokens: Annotated[int | None, Field(ge=1, le=4096)] = None
+    stream: bool = False
+
+class ChatResponse(BaseModel):
+    id: str
+    model: str
+    message: ChatMessage
+    usage: Dict[str, int]
+    created_at: str
+
+class CompletionRequest(APIRequest):
+    prompt: str
+    model: str = "gpt-4.1-mini"
+    temperature: Annotated[float, Field(ge=0, le=2)] = 0.7
+    max_tokens: Annotated[int | None, Field(ge=1, le=4096)] = 500
+
+class CompletionResponse(BaseModel):
+    id: str
+    model: str
+    text: str
+    usage: Dict[str, int]
+    created_at: str
+
+class EmbeddingRequest(APIRequest):
+    input: str | List[str]
+    model: str = "text-embedding-ada-002"
+
+class EmbeddingResponse(BaseModel):
+    embeddings: List[List[float]]
+    model: str
+    usage: Dict[str, int]
+
+@router.post("/chat", responses={200: {"model": ChatResponse}})
+async def chat_completion(
+    request: ChatRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Generate chat completion using LLM
+    """
+    try:
+        # Convert messages to OpenAI format
+        messages = openai_messages(request)
+        
+        # Call OpenAI API
+        response = await runtime.openai_client.chat.completions.create(
+            model=request.model,
+            messages=messages,
+            temperature=request.temperature,
+            max_tokens=request.max_tokens,
+        )
+        
+        return ChatResponse(
+            id=response.id,
+            model=response.model,
+            message=ChatMessage(
+                role=response.choices[0].message.role,
+                content=response.choices[0].message.content
+            ),
+            usage=token_usage(response.usage),
+            created_at=runtime.now_iso
+        )
+    except Exception as e:
+        logger.exception("Chat completion error")
+        raise openai_exc_to_http(e) from e
+
+@router.post("/completions", responses={200: {"model": CompletionResponse}})
+async def text_completion(
+    request: CompletionRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Generate text completion
+    """
+    try:
+        # Use chat completion for text completion
+        response = await runtime.openai_client.chat.completions.create(
+            model=request.model,
+            messages=[{"role": "user", "content": request.prompt}],
+            temperature=request.temperature,
+            max_tokens=request.max_tokens,
+        )
+        
+        return CompletionResponse(
+            id=response.id,
+            model=response.model,
+            text=response.choices[0].message.content,
+            usage=token_usage(response.usage),
+            created_at=runtime.now_iso
+        )
+    except Exception as e:
+        logger.exception("Text completion error")
+        raise openai_exc_to_http(e) from e
+
+@router.post("/embeddings", responses={200: {"model": EmbeddingResponse}})
+async def create_embeddings(
+    request: EmbeddingRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Generate embeddings for text
+    """
+    try:
+        # Ensure input is a list
+        inputs = [request.input] if isinstance(request.input, str) else request.input
+        
+        # Call OpenAI embeddings API
+        response = await runtime.openai_client.embeddings.create(
+            model=request.model,
+            input=inputs
+        )
+        
+        embeddings = [item.embedding for item in response.data]
+        
+        return EmbeddingResponse(
+            embeddings=embeddings,
+            model=response.model,
+            usage=token_usage(response.usage)
+        )
+    except Exception as e:
+        logger.exception("Embeddings error")
+        raise openai_exc_to_http(e) from e
@@ -0,0 +1,71 @@
+"""
+Shared request models, helpers and dependencies for the API routers
+"""
+
+from fastapi import HTTPException, Header
+from pydantic import BaseModel, ConfigDict
+from typing import List, Dict, TypedDict
+import openai
+
+class APIRequest(BaseModel):
+    """Base for request bodies; unknown fields are rejected with a 422 instead of dropped"""
+    model_config = ConfigDict(extra="forbid")
+
+class ChatMessage(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
+    role: str
+    content: str
+
+class OpenAIMessage(TypedDict):
+    """Wire shape of a chat message in OpenAI requests"""
+    role: str
+    content: str
+
+def openai_messages(request: BaseModel) -> List[OpenAIMessage]:
+    """Serialize a request's ChatMessages in one Rust-side dump, not per turn in Python"""
+    return request.model_dump(include={"messages"})["messages"]
+
+# Token counters surfaced to clients; newer SDKs add nested *_details objects
+USAGE_FIELDS = {"prompt_tokens", "completion_tokens", "total_tokens"}
+
+def token_usage(usage: BaseModel) -> Dict[str, int]:
+    """Dump an OpenAI usage object's token counts in a single call"""
+    return usage.model_dump(include=USAGE_FIELDS)
+
+# Upstream failures mapped to client-facing status codes; checked in order so
+# subclasses (e.g. APITimeoutError) win over their bases (APIError)
+_OPENAI_ERROR_STATUS = (
+    (openai.RateLimitError, 429, "Model provider rate limit exceeded"),
+    (openai.BadRequestError, 400, "Request rejected by model provider"),
+    (openai.NotFoundError, 404, "Model not found"),
+    (openai.AuthenticationError, 502, "Model provider authentication failed"),
+    (openai.PermissionDeniedError, 502, "Model provider authentication failed"),
+    (openai.APITimeoutError, 504, "Model provider timed out"),
+    (openai.APIError, 502, "Model provider error"),
+)
+
+def openai_exc_to_http(e: Exception) -> HTTPException:
+    """Map an exception to an HTTPException with a static, non-leaking detail"""
+    if isinstance(e, HTTPException):
+        return e
+    for exc_type, status_code, detail in _OPENAI_ERROR_STATUS:
+        if isinstance(e, exc_type):
+            return HTTPException(status_code=status_code, detail=detail)
+    return HTTPException(status_code=500, detail="Internal server error")
+
+# Dependency for API key validation
+_AUTH_SCHEMES = frozenset(("Bearer", "ApiKey"))
+
+async def verify_api_key(authorization: str | None = Header(None)):
+    if not authorization:
+        raise HTTPException(status_code=401, detail="No authorization header")
+    
+    scheme, _, token = authorization.partition(" ")
+    if scheme not in _AUTH_SCHEMES or not token or " " in token:
+        raise HTTPException(status_code=401, detail="Invalid authorization format")
+    
+    # In production, validate against database: preload SHA-256 digests of the
+    # issued keys and check sha256(token) with hmac.compare_digest
+    # For now, just check if key exists
+    return token
@@ -0,0 +1,118 @@
+"""
+Retrieval Augmented Generation endpoints
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Dict, Any
+from functools import lru_cache
+import logging
+
+import runtime
+from routers.common import APIRequest, openai_exc_to_http, verify_api_key
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Imported on first use so numpy and the RAG service stay off the cold-start
+# path for processes that never hit these endpoints
+@lru_cache(maxsize=1)
+def _rag():
+    from services.rag_service import rag_service
+    return rag_service
+
+class RAGIndexRequest(APIRequest):
+    text: str
+    metadata: Dict[str, Any] | None = None
+    chunk_size: Annotated[int, Field(ge=100, le=2000)] = 500
+
+class RAGIndexResponse(BaseModel):
+    chunks: int
+    document_id: str
+    status: str
+
+class RAGQueryRequest(APIRequest):
+    query: str
+    top_k: Annotated[int, Field(ge=1, le=20)] = 5
+    system_prompt: str | None = None
+    temperature: Annotated[float, Field(ge=0, le=2)] = 0.7
+
+class RAGQueryResponse(BaseModel):
+    answer: str
+    sources: List[str]
+    retrieval: Dict[str, Any]
+    usage: Dict[str, int]
+    # True when the answer was reused from an earlier query
+    cached: bool = False
+
+@router.post("/rag/index", responses={200: {"model": RAGIndexResponse}})
+async def index_document(
+    request: RAGIndexRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Index a document for RAG retrieval
+    """
+    try:
+        import uuid
+        
+        # Index the document
+        indexed_docs = await _rag().index_document(
+            text=request.text,
+            metadata=request.metadata,
+            chunk_size=request.chunk_size
+        )
+        
+        document_id = str(uuid.uuid4())
+        
+        await runtime.vector_store.connect()
+        await runtime.vector_store.add_document(document_id, indexed_docs)
+        # Cached answers may not reflect the new document. This only clears
+        # this worker's cache; other workers catch up when their entries expire
+        _rag().cache.clear()
+        
+        return RAGIndexResponse(
+            chunks=len(indexed_docs),
+            document_id=document_id,
+            status="indexed"
+        )
+    except Exception as e:
+        logger.exception("Document indexing error")
+        raise openai_exc_to_http(e) from e
+
+@router.post("/rag/query", responses={200: {"model": RAGQueryResponse}})
+async def rag_query(
+    request: RAGQueryRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Query the RAG system
+    """
+    try:
+        await runtime.vector_store.connect()
+        
+        if await runtime.vector_store.is_empty():
+            raise HTTPException(status_code=404, detail="No documents indexed")
+        
+        # Perform RAG query
+        result = await _rag().rag_query(
+            query=request.query,
+            knowledge_base=runtime.vector_store,
+            top_k=request.top_k,
+            system_prompt=request.system_prompt,
+            temperature=request.temperature
+        )
+        
+        return RAGQueryResponse(
+            answer=result["answer"],
+            sources=result["sources"],
+            retrieval=result["retrieval"],
+            usage=result["usage"],
+            cached=result["cached"]
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("RAG query error")
+        raise openai_exc_to_http(e) from e
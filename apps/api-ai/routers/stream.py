@@ -0,0 +1,91 @@
+"""
+Streaming (Server-Sent Events) endpoints
+"""
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from pydantic import Field
+from typing import Annotated, List
+from functools import lru_cache
+import logging
+
+from routers.common import (
+    APIRequest,
+    ChatMessage,
+    openai_exc_to_http,
+    openai_messages,
+    verify_api_key,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Imported on first use so the streaming service stays off the cold-start path
+@lru_cache(maxsize=1)
+def _streaming():
+    from services.streaming_service import streaming_service
+    return streaming_service
+
+# Stop reverse proxies (nginx) from buffering the event stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+class StreamChatRequest(APIRequest):
+    messages: List[ChatMessage]
+    model: str = "gpt-4.1-mini"
+    temperature: Annotated[float, Field(ge=0, le=2)] = 0.7
+    max_tokens: Annotated[int | None, Field(ge=1, le=4096)] = None
+
+@router.post("/chat/stream")
+async def stream_chat(
+    request: StreamChatRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Stream chat completion responses
+    """
+    try:
+        messages = openai_messages(request)
+        
+        return StreamingResponse(
+            _streaming().stream_chat_completion(
+                messages=messages,
+                model=request.model,
+                temperature=request.temperature,
+                max_tokens=request.max_tokens
+            ),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS
+        )
+    except Exception as e:
+        logger.exception("Stream chat error")
+        raise openai_exc_to_http(e) from e
+
+class StreamTextRequest(APIRequest):
+    prompt: str
+    model: str = "gpt-4.1-mini"
+    temperature: Annotated[float, Field(ge=0, le=2)] = 0.7
+    max_tokens: Annotated[int, Field(ge=1, le=4096)] = 500
+
+@router.post("/completions/stream")
+async def stream_completion(
+    request: StreamTextRequest,
+    api_key: str = Depends(verify_api_key)
+):
+    """
+    Stream text completion responses
+    """
+    try:
+        return StreamingResponse(
+            _streaming().stream_text_completion(
+                prompt=request.prompt,
+                model=request.model,
+                temperature=request.temperature,
+                max_tokens=request.max_tokens
+            ),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS
+        )
+    except Exception as e:
+        logger.exception("Stream completion error")
+        raise openai_exc_to_http(e) from e
@@ -0,0 +1,59 @@
+"""
+Process-wide runtime state shared by the API routers
+Holds the OpenAI client, the RAG vector store and the cached response
+timestamp. Read these as attributes of this module (runtime.openai_client)
+so the values set by start() are seen.
+"""
+
+from openai import AsyncOpenAI
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from config import settings
+from services._client import close_shared_client, shared_client
+from services.vector_store import VectorStore
+
+logger = logging.getLogger(__name__)
+
+# The process-wide OpenAI client (also used by the services), set in start()
+openai_client: AsyncOpenAI | None = None
+
+# RAG chunk storage; connects on the first RAG request
+vector_store = VectorStore(settings.database_url, quantization=settings.rag_vector_quantization)
+
+# Response timestamp, refreshed once per second instead of formatted per request
+now_iso = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+_clock: asyncio.Task | None = None
+
+async def _refresh_timestamp():
+    """Keep now_iso current to the second"""
+    global now_iso
+    
+    while True:
+        now_iso = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        await asyncio.sleep(1)
+
+async def start():
+    """Build the shared clients and start the timestamp clock"""
+    global openai_client, _clock
+    
+    try:
+        openai_client = shared_client()
+    except Exception as e:
+        logger.error("Failed to initialize OpenAI client: %s", e)
+        raise
+    
+    _clock = asyncio.create_task(_refresh_timestamp())
+
+async def stop():
+    """Stop the clock and release pooled connections"""
+    global openai_client, _clock
+    
+    if _clock is not None:
+        _clock.cancel()
+        _clock = None
+    await close_shared_client()
+    openai_client = None
+    await vector_store.close()
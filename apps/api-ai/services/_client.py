@@ -0,0 +1,30 @@
+"""
+Shared OpenAI client
+One AsyncOpenAI client, and so one HTTP/2 connection pool, per process for the
+API routers and the RAG, streaming and agent services
+"""
+
+from functools import lru_cache
+from openai import AsyncOpenAI
+import httpx
+
+from config import settings
+
+@lru_cache(maxsize=1)
+def shared_client() -> AsyncOpenAI:
+    """Build the process-wide OpenAI client on first use"""
+    # HTTP/2 lets concurrent requests and streams multiplex over a few TLS connections
+    return AsyncOpenAI(
+        api_key=settings.openai_api_key.get_secret_value(),
+        http_client=httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        ),
+    )
+
+async def close_shared_client():
+    """Close the shared client's connections; the next use builds a new one"""
+    if shared_client.cache_info().currsize:
+        await shared_client().close()
+        shared_client.cache_clear()
@@ -4,10 +4,19 @@ Implements autonomous agents with tool calling, memory, and planning
 """
 
 from typing import List, Dict, Any, Optional, Callable
-from openai import OpenAI
+from collections import OrderedDict, deque
+from itertools import islice
+from openai import AsyncOpenAI
+import asyncio
+import hashlib
 import json
+import orjson
 import logging
-from datetime import datetime
+import time
+from datetime import datetime, timezone
+
+from services._client import shared_client
+from services.calculator import evaluate
 
 logger = logging.getLogger(__name__)
 
@@ -25,10 +34,9 @@ class Tool:
         self.description = description
         self.parameters = parameters
         self.function = function
-    
-    def to_openai_format(self) -> Dict[str, Any]:
-        """Convert tool to OpenAI function calling format"""
-        return {
+        
+        # Built once; the same dict is sent on every LLM call
+        self._openai_format = {
             "type": "function",
             "function": {
                 "name": self.name,
@@ -37,19 +45,71 @@ class Tool:
             }
         }
     
+    def to_openai_format(self) -> Dict[str, Any]:
+        """Convert tool to OpenAI function calling format"""
+        return self._openai_format
+    
     async def execute(self, **kwargs) -> Any:
         """Execute the tool function"""
         try:
             return await self.function(**kwargs) if callable(self.function) else self.function(**kwargs)
         except Exception as e:
-            logger.error(f"Tool execution failed: {str(e)}")
+            logger.error("Tool execution failed: %s", e)
             return {"error": str(e)}
 
+def _json_dumps(value: Any) -> str:
+    """Serialize with orjson, falling back to json for integers beyond 64 bits"""
+    try:
+        return orjson.dumps(value).decode()
+    except orjson.JSONEncodeError:
+        return json.dumps(value)
+
+class LLMCache:
+    """In-process LRU cache with TTL for deterministic LLM responses"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+    
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """Hash a request payload in canonical JSON form"""
+        canonical = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS, default=str)
+        return hashlib.sha256(canonical).hexdigest()
+    
+    def get(self, key: str) -> Any:
+        """Return the cached value, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+    
+    def set(self, key: str, value: Any):
+        """Store a value, evicting the least recently used entry when full"""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop all entries"""
+        self._entries.clear()
+
+# Shared by all agents; only temperature-0 calls are stored
+llm_cache = LLMCache()
+
 class AgentMemory:
     """Agent memory for storing conversation history and context"""
     
     def __init__(self, max_messages: int = 50):
-        self.messages: List[Dict[str, Any]] = []
+        # Bounded deque: appends are O(1) and the oldest message drops automatically
+        self.messages: deque = deque(maxlen=max_messages)
         self.max_messages = max_messages
         self.metadata: Dict[str, Any] = {}
     
@@ -58,26 +118,27 @@ class AgentMemory:
         message = {
             "role": role,
             "content": content,
-            "timestamp": datetime.utcnow().isoformat()
+            "ts": time.time_ns()
         }
         if metadata:
             message["metadata"] = metadata
         
         self.messages.append(message)
-        
-        # Trim if exceeds max
-        if len(self.messages) > self.max_messages:
-            self.messages = self.messages[-self.max_messages:]
     
     def get_messages(self, last_n: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get messages from memory"""
         if last_n:
-            return self.messages[-last_n:]
-        return self.messages
+            return list(islice(self.messages, max(len(self.messages) - last_n, 0), None))
+        return list(self.messages)
+    
+    @staticmethod
+    def timestamp_iso(message: Dict[str, Any]) -> str:
+        """Format a stored message's epoch-nanosecond timestamp as UTC ISO 8601"""
+        return datetime.fromtimestamp(message["ts"] / 1e9, tz=timezone.utc).isoformat()
     
     def clear(self):
         """Clear all messages"""
-        self.messages = []
+        self.messages.clear()
     
     def set_metadata(self, key: str, value: Any):
         """Set metadata"""
@@ -97,7 +158,8 @@ class Agent:
         tools: Optional[List[Tool]] = None,
         model: str = "gpt-4.1-mini",
         temperature: float = 0.7,
-        max_iterations: int = 10
+        max_iterations: int = 10,
+        client: Optional[AsyncOpenAI] = None
     ):
         self.name = name
         self.system_prompt = system_prompt
@@ -106,15 +168,52 @@ class Agent:
         self.temperature = temperature
         self.max_iterations = max_iterations
         self.memory = AgentMemory()
-        self.client = OpenAI()
+        # Agents are created per request; reuse one connection pool across them
+        self.client = client or shared_client()
+        self.cache = llm_cache
+        self.stats = {"cache_hits": 0, "cache_misses": 0}
         
         # Tool registry
         self.tool_registry = {tool.name: tool for tool in self.tools}
+        self._tools_payload = [tool.to_openai_format() for tool in self.tools]
     
     def add_tool(self, tool: Tool):
         """Add a tool to the agent"""
         self.tools.append(tool)
         self.tool_registry[tool.name] = tool
+        self._tools_payload.append(tool.to_openai_format())
+    
+    async def _execute_tool(self, tool_name: str, tool_args: Dict[str, Any]) -> Any:
+        """Run a registered tool, or report that it does not exist"""
+        if tool_name in self.tool_registry:
+            return await self.tool_registry[tool_name].execute(**tool_args)
+        return {
+            "error": f"Tool {tool_name} not found. Available tools: {', '.join(self.tool_registry) or 'none'}"
+        }
+    
+    async def _complete(self, api_params: Dict[str, Any]):
+        """
+        Call the chat completions API, serving repeat deterministic calls from cache
+        
+        Only temperature-0 requests are cached: for those an identical model,
+        message list and tool set is expected to produce the same response.
+        
+        Returns:
+            The response, and whether it came from the cache
+        """
+        if self.temperature != 0:
+            return await self.client.chat.completions.create(**api_params), False
+        
+        key = self.cache.make_key(api_params)
+        response = self.cache.get(key)
+        if response is not None:
+            self.stats["cache_hits"] += 1
+            return response, True
+        
+        self.stats["cache_misses"] += 1
+        response = await self.client.chat.completions.create(**api_params)
+        self.cache.set(key, response)
+        return response, False
     
     async def think(self, user_input: str) -> Dict[str, Any]:
         """
@@ -129,7 +228,8 @@ class Agent:
         # Add user message to memory
         self.memory.add_message("user", user_input)
         
-        # Build messages for API call
+        # Build messages for API call once; iterations only append to it so the
+        # prefix stays byte-identical and OpenAI's prompt cache can reuse it
         messages = [
             {"role": "system", "content": self.system_prompt}
         ] + [
@@ -139,6 +239,7 @@ class Agent:
         
         execution_trace = []
         iteration = 0
+        unknown_tool_attempts = 0
         
         while iteration < self.max_iterations:
             iteration += 1
@@ -152,12 +253,12 @@ class Agent:
             
             # Add tools if available
             if self.tools:
-                api_params["tools"] = [tool.to_openai_format() for tool in self.tools]
+                api_params["tools"] = self._tools_payload
                 api_params["tool_choice"] = "auto"
             
             # Call LLM
             try:
-                response = self.client.chat.completions.create(**api_params)
+                response, cached = await self._complete(api_params)
                 choice = response.choices[0]
                 message = choice.message
                 
@@ -170,10 +271,10 @@ class Agent:
                 
                 # Check if tool calls are needed
                 if choice.finish_reason == "tool_calls" and message.tool_calls:
-                    # Execute tool calls
+                    calls = []
                     for tool_call in message.tool_calls:
                         tool_name = tool_call.function.name
-                        tool_args = json.loads(tool_call.function.arguments)
+                        tool_args = orjson.loads(tool_call.function.arguments)
                         
                         execution_trace.append({
                             "iteration": iteration,
@@ -181,12 +282,38 @@ class Agent:
                             "tool": tool_name,
                             "arguments": tool_args
                         })
-                        
-                        # Execute tool
-                        if tool_name in self.tool_registry:
-                            tool_result = await self.tool_registry[tool_name].execute(**tool_args)
-                        else:
-                            tool_result = {"error": f"Tool {tool_name} not found"}
+                        calls.append((tool_call, tool_name, tool_args))
+                    
+                    # One bad tool name gets a corrective error listing the valid
+                    # tools; a repeat means the model is not recovering, so stop
+                    # rather than spend the remaining iterations
+                    if any(tool_name not in self.tool_registry for _, tool_name, _ in calls):
+                        unknown_tool_attempts += 1
+                        if unknown_tool_attempts > 1:
+                            return {
+                                "answer": "I apologize, but I couldn't complete the task because the requested tools are not available.",
+                                "iterations": iteration,
+                                "execution_trace": execution_trace,
+                                "error": "unknown_tool"
+                            }
+                    
+                    # Tool calls from one turn are independent, so run them concurrently
+                    tool_results = await asyncio.gather(
+                        *(self._execute_tool(tool_name, tool_args) for _, tool_name, tool_args in calls),
+                        return_exceptions=True
+                    )
+                    
+                    # OpenAI expects a single assistant message carrying every
+                    # tool call, followed by one tool message per call
+                    messages.append({
+                        "role": "assistant",
+                        "content": None,
+                        "tool_calls": [tool_call.model_dump() for tool_call, _, _ in calls]
+                    })
+                    
+                    for (tool_call, tool_name, _), tool_result in zip(calls, tool_results):
+                        if isinstance(tool_result, Exception):
+                            tool_result = {"error": str(tool_result)}
                         
                         execution_trace.append({
                             "iteration": iteration,
@@ -195,16 +322,10 @@ class Agent:
                             "result": tool_result
                         })
                         
-                        # Add tool result to messages
-                        messages.append({
-                            "role": "assistant",
-                            "content": None,
-                            "tool_calls": [tool_call.model_dump()]
-                        })
                         messages.append({
                             "role": "tool",
                             "tool_call_id": tool_call.id,
-                            "content": json.dumps(tool_result)
+                            "content": _json_dumps(tool_result)
                         })
                     
                     # Continue loop to get final answer
@@ -214,19 +335,31 @@ class Agent:
                 final_answer = message.content
                 self.memory.add_message("assistant", final_answer)
                 
+                # A cached response cost nothing this time
+                if cached:
+                    usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "cached_tokens": 0}
+                else:
+                    usage = {
+                        "prompt_tokens": response.usage.prompt_tokens,
+                        "completion_tokens": response.usage.completion_tokens,
+                        "total_tokens": response.usage.total_tokens,
+                        "cached_tokens": getattr(
+                            getattr(response.usage, "prompt_tokens_details", None),
+                            "cached_tokens",
+                            0
+                        ) or 0
+                    }
+                
                 return {
                     "answer": final_answer,
                     "iterations": iteration,
                     "execution_trace": execution_trace,
-                    "usage": {
-                        "prompt_tokens": response.usage.prompt_tokens,
-                        "completion_tokens": response.usage.completion_tokens,
-                        "total_tokens": response.usage.total_tokens
-                    }
+                    "usage": usage,
+                    "cache": dict(self.stats)
                 }
                 
             except Exception as e:
-                logger.error(f"Agent thinking failed: {str(e)}")
+                logger.error("Agent thinking failed: %s", e)
                 execution_trace.append({
                     "iteration": iteration,
                     "type": "error",
@@ -272,7 +405,7 @@ async def search_web(query: str) -> Dict[str, Any]:
 async def calculate(expression: str) -> Dict[str, Any]:
     """Calculator tool"""
     try:
-        result = eval(expression)
+        result = evaluate(expression)
         return {"expression": expression, "result": result}
     except Exception as e:
         return {"error": str(e)}
@@ -330,7 +463,9 @@ TIME_TOOL = Tool(
 # Agent factory
 def create_agent(
     agent_type: str = "general",
-    tools: Optional[List[Tool]] = None
+    tools: Optional[List[Tool]] = None,
+    client: Optional[AsyncOpenAI] = None,
+    temperature: float = 0.7
 ) -> Agent:
     """Create a pre-configured agent"""
     
@@ -353,4 +488,4 @@ def create_agent(
     }
     
     config = agent_configs.get(agent_type, agent_configs["general"])
-    return Agent(**config)
+    return Agent(**config, temperature=temperature, client=client)
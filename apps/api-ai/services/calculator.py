@@ -0,0 +1,124 @@
+"""
+Safe arithmetic evaluation for the agent calculator tool
+Expressions are parsed, whitelisted and evaluated node by node; integer
+operands are size-checked before each operation so a single expression
+cannot tie up the event loop
+"""
+
+from functools import lru_cache
+from typing import Any
+import ast
+import math
+import operator
+
+# Names a calculator expression may reference
+SAFE_MATH = {
+    name: getattr(math, name)
+    for name in (
+        "pi", "e", "tau", "sqrt", "exp", "log", "log10", "log2",
+        "sin", "cos", "tan", "asin", "acos", "atan", "floor", "ceil", "fabs"
+    )
+}
+# Largest integer, in bits, an operand or result may have
+MAX_INT_BITS = 4096
+
+# Largest |ndigits| round() accepts; CPython computes 10**abs(ndigits) for it
+MAX_ROUND_DIGITS = 400
+
+def _round(number: Any, ndigits: Any = None) -> Any:
+    """round() with ndigits bounded before the builtin does any work"""
+    if ndigits is None:
+        return round(number)
+    if not isinstance(ndigits, int) or abs(ndigits) > MAX_ROUND_DIGITS:
+        raise ValueError(f"round() ndigits must be an integer within ±{MAX_ROUND_DIGITS}")
+    return round(number, ndigits)
+
+SAFE_MATH.update({"abs": abs, "round": _round, "min": min, "max": max})
+
+_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+_UNARY_OPS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+@lru_cache(maxsize=1024)
+def _parse(expression: str) -> ast.expr:
+    """Parse an expression once; evaluation re-validates every node"""
+    return ast.parse(expression, mode="eval").body
+
+def _check_size(value: Any) -> Any:
+    """Reject non-real results and integers too large to keep computing with"""
+    if not isinstance(value, (int, float)):
+        raise ValueError(f"Unsupported result type: {type(value).__name__}")
+    if isinstance(value, int) and value.bit_length() > MAX_INT_BITS:
+        raise ValueError("Result too large")
+    return value
+
+def _power(base: Any, exponent: Any) -> Any:
+    """Exponentiation that refuses integer results above MAX_INT_BITS up front"""
+    if (
+        isinstance(base, int) and isinstance(exponent, int)
+        and exponent > 0 and abs(base) > 1
+        and (abs(base).bit_length() - 1) * exponent > MAX_INT_BITS
+    ):
+        raise ValueError("Exponent too large")
+    return base ** exponent
+
+def _evaluate(node: ast.expr) -> Any:
+    """Evaluate a whitelisted AST node"""
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ValueError("Only numeric literals are allowed")
+        return _check_size(node.value)
+    
+    if isinstance(node, ast.Name):
+        value = SAFE_MATH.get(node.id)
+        if value is None or callable(value):
+            raise ValueError(f"Unknown name: {node.id}")
+        return value
+    
+    if isinstance(node, ast.BinOp):
+        op = _BINARY_OPS.get(type(node.op))
+        if op is None:
+            raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+        left, right = _evaluate(node.left), _evaluate(node.right)
+        if op is operator.pow:
+            return _check_size(_power(left, right))
+        return _check_size(op(left, right))
+    
+    if isinstance(node, ast.UnaryOp):
+        op = _UNARY_OPS.get(type(node.op))
+        if op is None:
+            raise ValueError(f"Unsupported operator: {type(node.op).__name__}")
+        return _check_size(op(_evaluate(node.operand)))
+    
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.keywords:
+            raise ValueError("Only plain calls to math functions are allowed")
+        func = SAFE_MATH.get(node.func.id)
+        if not callable(func):
+            raise ValueError(f"Unknown function: {node.func.id}")
+        return _check_size(func(*(_evaluate(arg) for arg in node.args)))
+    
+    raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+
+def evaluate(expression: str) -> Any:
+    """
+    Evaluate an arithmetic expression
+    
+    Raises:
+        ValueError: If the expression uses anything beyond numeric literals,
+            + - * / // % **, and the functions and constants in SAFE_MATH, if
+            an integer grows beyond MAX_INT_BITS, or if a result is not a
+            real number
+    """
+    return _evaluate(_parse(expression))
@@ -0,0 +1,185 @@
+"""
+In-memory Embedding Store for RAG chunks
+Keeps all chunk embeddings in one contiguous float32 matrix (structure of
+arrays) with a parallel list of chunk metadata, so a query is a single
+vectorized scan instead of per-document list conversions. Rows are stored
+unit-normalized, making cosine similarity a plain matrix-vector product.
+"""
+
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, without a full sort"""
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k >= len(scores):
+        return np.argsort(-scores)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+class EmbeddingStore:
+    """Contiguous in-memory storage and exact nearest-neighbour search for RAG chunks"""
+    
+    def __init__(self, dimensions: Optional[int] = None, capacity: int = 1024):
+        self.dimensions = dimensions
+        self.metadata: List[Dict[str, Any]] = []
+        # Row buffer grows by doubling so appends are amortized O(1)
+        self._capacity = capacity
+        self._vectors: Optional[np.ndarray] = None
+        # fp16 copy on the GPU for batched search, refreshed after appends
+        self._gpu_vectors = None
+    
+    @classmethod
+    def from_documents(cls, documents: List[Dict[str, Any]]) -> "EmbeddingStore":
+        """Build a store from documents carrying an 'embedding' field"""
+        candidates = [doc for doc in documents if 'embedding' in doc]
+        store = cls(capacity=max(len(candidates), 1))
+        store.add(candidates)
+        return store
+    
+    def __len__(self) -> int:
+        return len(self.metadata)
+    
+    @property
+    def vectors(self) -> np.ndarray:
+        """(N, D) float32 view of the stored unit-normalized embeddings"""
+        if self._vectors is None:
+            return np.empty((0, self.dimensions or 0), dtype=np.float32)
+        return self._vectors[:len(self)]
+    
+    def _reserve(self, rows: int):
+        """Make room for `rows` more vectors"""
+        needed = len(self) + rows
+        if self._vectors is None:
+            capacity = max(self._capacity, needed)
+            self._vectors = np.empty((capacity, self.dimensions), dtype=np.float32)
+            return
+        
+        capacity = self._vectors.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        vectors = np.empty((capacity, self.dimensions), dtype=np.float32)
+        vectors[:len(self)] = self.vectors
+        self._vectors = vectors
+    
+    def add(self, chunks: List[Dict[str, Any]]) -> int:
+        """
+        Append chunks, storing their embeddings as matrix rows
+        
+        Args:
+            chunks: Dicts with an 'embedding' field; the remaining fields are
+                kept as the chunk's metadata
+        
+        Returns:
+            Number of chunks stored
+        """
+        if not chunks:
+            return 0
+        
+        embeddings = np.asarray([chunk['embedding'] for chunk in chunks], dtype=np.float32)
+        if self.dimensions is None:
+            self.dimensions = embeddings.shape[1]
+        elif embeddings.shape[1] != self.dimensions:
+            raise ValueError(f"Expected {self.dimensions}-d embeddings, got {embeddings.shape[1]}-d")
+        
+        # Normalize once here so queries never touch document norms
+        norms = np.sqrt(np.einsum("ij,ij->i", embeddings, embeddings))
+        norms[norms == 0] = 1.0
+        
+        self._reserve(len(chunks))
+        start = len(self)
+        self._vectors[start:start + len(chunks)] = embeddings / norms[:, None]
+        self.metadata.extend(
+            {k: v for k, v in chunk.items() if k != 'embedding'}
+            for chunk in chunks
+        )
+        return len(chunks)
+    
+    async def add_document(self, document_id: str, chunks: List[Dict[str, Any]]) -> int:
+        """Store the indexed chunks of one document"""
+        return self.add([{**chunk, 'document_id': document_id} for chunk in chunks])
+    
+    async def search(self, query_embedding, top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Return the top_k chunks closest to the query by cosine similarity
+        
+        Args:
+            query_embedding: Embedding of the query
+            top_k: Number of chunks to return
+        
+        Returns:
+            Chunks with their metadata and a 'similarity' score
+        """
+        if not self.metadata:
+            return []
+        
+        query = np.asarray(query_embedding, dtype=np.float32)
+        similarities = self.vectors @ (query / np.sqrt(np.vdot(query, query)))
+        return [
+            {**self.metadata[i], 'similarity': float(similarities[i])}
+            for i in top_k_indices(similarities, top_k)
+        ]
+    
+    def _gpu_matrix(self):
+        """fp16 CUDA copy of the vectors, or None when no GPU is available"""
+        try:
+            import torch
+        except ImportError:
+            return None
+        if not torch.cuda.is_available():
+            return None
+        
+        # The store is append-only, so a row count mismatch means it is stale
+        if self._gpu_vectors is None or self._gpu_vectors.shape[0] != len(self):
+            self._gpu_vectors = torch.from_numpy(self.vectors).to("cuda", dtype=torch.float16)
+        return self._gpu_vectors
+    
+    async def search_batch(self, query_embeddings, top_k: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        Return the top_k chunks for each of several queries
+        
+        Scores all queries against all chunks in one matrix product, on the GPU
+        when CUDA is available; only the top-k indices and scores come back
+        to the host.
+        
+        Args:
+            query_embeddings: Embeddings of the queries, one per row
+            top_k: Number of chunks to return per query
+        
+        Returns:
+            One list of chunks with 'similarity' scores per query
+        """
+        if not self.metadata or len(query_embeddings) == 0:
+            return [[] for _ in query_embeddings]
+        
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+        k = max(min(top_k, len(self)), 0)
+        
+        gpu_vectors = self._gpu_matrix()
+        if gpu_vectors is not None:
+            import torch
+            
+            similarities = torch.from_numpy(queries).to(gpu_vectors.device, dtype=torch.float16) @ gpu_vectors.T
+            scores, indices = torch.topk(similarities, k, dim=1)
+            scores = scores.float().cpu().numpy()
+            indices = indices.cpu().numpy()
+        else:
+            similarities = queries @ self.vectors.T
+            indices = np.stack([top_k_indices(row, k) for row in similarities])
+            scores = np.take_along_axis(similarities, indices, axis=1)
+        
+        return [
+            [
+                {**self.metadata[i], 'similarity': float(score)}
+                for i, score in zip(row_indices, row_scores)
+            ]
+            for row_indices, row_scores in zip(indices, scores)
+        ]
+    
+    async def is_empty(self) -> bool:
+        """Check whether any chunk has been stored"""
+        return not self.metadata
@@ -4,14 +4,25 @@ Provides document scanning, text extraction, and visual understanding
 """
 
 from typing import List, Dict, Any, Optional, Union
+from functools import singledispatchmethod
 import base64
 import io
 import logging
 from PIL import Image
+import asyncio
 import os
 
 logger = logging.getLogger(__name__)
 
+# Leading characters of base64 payloads: data URI, PNG, JPEG
+_BASE64_IMAGE_PREFIXES = ("data:image", "iVBOR", "/9j/")
+
+# Supported weight quantization schemes for OCRService(quantize=...)
+_QUANTIZE_MODES = ("int8", "fp8")
+
+class PDFRenderingUnavailable(RuntimeError):
+    """The poppler utilities pdf2image renders pages with are not installed"""
+
 class OCRService:
     """
     OCR Service using DeepSeek-OCR for document processing
@@ -24,8 +35,19 @@ class OCRService:
     - Visual description: Describe images in detail
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        max_batch: int = 4,
+        compile_model: bool = False,
+        quantize: Optional[str] = None
+    ):
+        if quantize is not None and quantize not in _QUANTIZE_MODES:
+            raise ValueError(f"Unsupported quantize mode: {quantize}")
+        
         self.model_name = "deepseek-ai/DeepSeek-OCR"
+        self.max_batch = max_batch
+        self.compile_model = compile_model
+        self.quantize = quantize
         self.model = None
         self.tokenizer = None
         self.initialized = False
@@ -37,25 +59,54 @@ class OCRService:
             
         try:
             from transformers import AutoModel, AutoTokenizer
+            import importlib.util
             import torch
             
             logger.info("Initializing DeepSeek-OCR model...")
             
+            # FlashAttention-2 needs CUDA and the flash_attn package; otherwise
+            # use PyTorch's fused SDPA kernels rather than failing to load
+            use_fa2 = torch.cuda.is_available() and importlib.util.find_spec("flash_attn") is not None
+            
             self.tokenizer = AutoTokenizer.from_pretrained(
                 self.model_name,
                 trust_remote_code=True
             )
             
+            load_kwargs = {}
+            if self.quantize == "int8":
+                from transformers import BitsAndBytesConfig
+                
+                # bitsandbytes places the weights on the GPU itself
+                load_kwargs["quantization_config"] = BitsAndBytesConfig(load_in_8bit=True)
+                load_kwargs["device_map"] = "auto"
+            
             self.model = AutoModel.from_pretrained(
                 self.model_name,
-                _attn_implementation='flash_attention_2',
+                _attn_implementation='flash_attention_2' if use_fa2 else 'sdpa',
                 trust_remote_code=True,
-                use_safetensors=True
+                use_safetensors=True,
+                **load_kwargs
             )
             
             # Move to GPU if available
             if torch.cuda.is_available():
-                self.model = self.model.eval().cuda().to(torch.bfloat16)
+                torch.backends.cuda.matmul.allow_tf32 = True
+                torch.set_float32_matmul_precision("high")
+                if self.quantize == "int8":
+                    # Already quantized and placed; casting would undo it
+                    self.model = self.model.eval()
+                else:
+                    self.model = self.model.eval().cuda().to(torch.bfloat16)
+                
+                if self.quantize == "fp8":
+                    from torchao.quantization import quantize_, float8_weight_only
+                    
+                    quantize_(self.model, float8_weight_only())
+                
+                if self.compile_model:
+                    # CUDA-graph capture of the decode loop; the first call pays the compile
+                    self.model = torch.compile(self.model, mode="reduce-overhead", dynamic=True)
             else:
                 self.model = self.model.eval()
                 
@@ -63,39 +114,95 @@ class OCRService:
             logger.info("DeepSeek-OCR model initialized successfully")
             
         except Exception as e:
-            logger.error(f"Failed to initialize OCR model: {str(e)}")
+            logger.error("Failed to initialize OCR model: %s", e)
             raise
     
-    def _load_image(self, image_input: Union[str, bytes, Image.Image]) -> Image.Image:
+    async def warmup(self):
+        """
+        Load the model ahead of the first request
+        
+        Runs the blocking load in a worker thread. Failures are logged and the
+        model falls back to loading on first use.
+        """
+        try:
+            await asyncio.to_thread(self._initialize_model)
+            
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.synchronize()
+        except Exception as e:
+            logger.warning("OCR warmup failed, model will load on first request: %s", e)
+    
+    def _open_image(self, source, max_size: Optional[int] = None) -> Image.Image:
+        """
+        Decode an image as RGB, shrinking large JPEGs to fit max_size
+        
+        For JPEGs, draft() lets libjpeg decode directly at 1/2, 1/4 or 1/8
+        scale, so oversized camera photos are never decoded at full resolution.
+        """
+        img = Image.open(source)
+        shrink = bool(max_size) and img.format == "JPEG"
+        if shrink:
+            img.draft("RGB", (max_size, max_size))
+        
+        if img.mode == "RGB":
+            # convert() would copy every pixel; load() decodes in place
+            img.load()
+        else:
+            img = img.convert("RGB")
+        
+        if shrink:
+            img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+        return img
+    
+    @singledispatchmethod
+    def _load_image(
+        self,
+        image_input: Union[str, bytes, Image.Image],
+        max_size: Optional[int] = None
+    ) -> Image.Image:
         """
         Load image from various input formats
         
+        Dispatches on the input type: file path or base64 string, bytes, or
+        PIL Image.
+        
         Args:
             image_input: Can be file path, base64 string, bytes, or PIL Image
+            max_size: Optional bound on the decoded JPEG size (e.g. base_size)
             
         Returns:
             PIL Image object
         """
-        if isinstance(image_input, Image.Image):
-            return image_input
-            
-        if isinstance(image_input, str):
-            # Check if it's a file path
-            if os.path.exists(image_input):
-                return Image.open(image_input).convert("RGB")
-            # Otherwise treat as base64
-            try:
-                image_data = base64.b64decode(image_input)
-                return Image.open(io.BytesIO(image_data)).convert("RGB")
-            except Exception as e:
-                logger.error(f"Failed to load image from base64: {str(e)}")
-                raise
-                
-        if isinstance(image_input, bytes):
-            return Image.open(io.BytesIO(image_input)).convert("RGB")
-            
         raise ValueError("Invalid image input format")
     
+    @_load_image.register
+    def _(self, image_input: Image.Image, max_size: Optional[int] = None) -> Image.Image:
+        return image_input
+    
+    @_load_image.register
+    def _(self, image_input: bytes, max_size: Optional[int] = None) -> Image.Image:
+        return self._open_image(io.BytesIO(image_input), max_size)
+    
+    @_load_image.register
+    def _(self, image_input: str, max_size: Optional[int] = None) -> Image.Image:
+        # API uploads are base64; only stat strings that could be a path
+        looks_base64 = len(image_input) > 512 or image_input.startswith(_BASE64_IMAGE_PREFIXES)
+        if not looks_base64 and os.path.exists(image_input):
+            return self._open_image(image_input, max_size)
+        # Otherwise treat as base64
+        try:
+            if image_input.startswith("data:"):
+                image_input = image_input.partition(",")[2]
+            image_data = base64.b64decode(image_input, validate=False)
+            return self._open_image(io.BytesIO(image_data), max_size)
+        except Exception as e:
+            logger.error("Failed to load image from base64: %s", e)
+            raise
+    
+    # The mode methods decode images in a worker thread so the event loop (and
+    # other requests' inference) keeps running while JPEGs are being decoded
+    
     async def free_ocr(
         self,
         image: Union[str, bytes, Image.Image],
@@ -116,7 +223,7 @@ class OCRService:
         self._initialize_model()
         
         try:
-            img = self._load_image(image)
+            img = await asyncio.to_thread(self._load_image, image, base_size)
             prompt = "<image>\nFree OCR."
             
             # For demo purposes, return mock data
@@ -132,7 +239,7 @@ class OCRService:
             return result
             
         except Exception as e:
-            logger.error(f"Free OCR failed: {str(e)}")
+            logger.error("Free OCR failed: %s", e)
             raise
     
     async def document_to_markdown(
@@ -157,7 +264,7 @@ class OCRService:
         self._initialize_model()
         
         try:
-            img = self._load_image(image)
+            img = await asyncio.to_thread(self._load_image, image, base_size)
             prompt = "<image>\n<|grounding|>Convert the document to markdown."
             
             # Mock result for demo
@@ -173,7 +280,7 @@ class OCRService:
             return result
             
         except Exception as e:
-            logger.error(f"Document to markdown failed: {str(e)}")
+            logger.error("Document to markdown failed: %s", e)
             raise
     
     async def grounded_ocr(
@@ -196,7 +303,7 @@ class OCRService:
         self._initialize_model()
         
         try:
-            img = self._load_image(image)
+            img = await asyncio.to_thread(self._load_image, image, base_size)
             prompt = "<image>\n<|grounding|>OCR this image."
             
             result = {
@@ -215,7 +322,7 @@ class OCRService:
             return result
             
         except Exception as e:
-            logger.error(f"Grounded OCR failed: {str(e)}")
+            logger.error("Grounded OCR failed: %s", e)
             raise
     
     async def parse_figure(
@@ -236,7 +343,7 @@ class OCRService:
         self._initialize_model()
         
         try:
-            img = self._load_image(image)
+            img = await asyncio.to_thread(self._load_image, image, base_size)
             prompt = "<image>\nParse the figure."
             
             result = {
@@ -255,7 +362,7 @@ class OCRService:
             return result
             
         except Exception as e:
-            logger.error(f"Figure parsing failed: {str(e)}")
+            logger.error("Figure parsing failed: %s", e)
             raise
     
     async def describe_image(
@@ -276,7 +383,7 @@ class OCRService:
         self._initialize_model()
         
         try:
-            img = self._load_image(image)
+            img = await asyncio.to_thread(self._load_image, image, base_size)
             prompt = "<image>\nDescribe this image in detail."
             
             result = {
@@ -289,7 +396,7 @@ class OCRService:
             return result
             
         except Exception as e:
-            logger.error(f"Image description failed: {str(e)}")
+            logger.error("Image description failed: %s", e)
             raise
     
     async def batch_ocr(
@@ -309,57 +416,108 @@ class OCRService:
         Returns:
             List of OCR results
         """
-        results = []
+        handlers = {
+            "free_ocr": self.free_ocr,
+            "document_to_markdown": self.document_to_markdown,
+            "grounded_ocr": self.grounded_ocr,
+            "parse_figure": self.parse_figure,
+            "describe_image": self.describe_image,
+        }
+        handler = handlers.get(mode)
+        if handler is None:
+            return [{"error": f"Unknown mode: {mode}", "status": "failed"} for _ in images]
         
-        for i, image in enumerate(images):
-            try:
-                if mode == "free_ocr":
-                    result = await self.free_ocr(image, base_size)
-                elif mode == "document_to_markdown":
-                    result = await self.document_to_markdown(image, base_size)
-                elif mode == "grounded_ocr":
-                    result = await self.grounded_ocr(image, base_size)
-                elif mode == "parse_figure":
-                    result = await self.parse_figure(image, base_size)
-                elif mode == "describe_image":
-                    result = await self.describe_image(image, base_size)
-                else:
-                    result = {"error": f"Unknown mode: {mode}", "status": "failed"}
-                
-                results.append(result)
-                
-            except Exception as e:
-                logger.error(f"Batch OCR failed for image {i}: {str(e)}")
-                results.append({
-                    "error": str(e),
+        # Cap concurrent inferences to bound GPU memory
+        semaphore = asyncio.Semaphore(self.max_batch)
+        
+        async def process(image):
+            async with semaphore:
+                return await handler(image, base_size)
+        
+        outcomes = await asyncio.gather(
+            *(process(image) for image in images),
+            return_exceptions=True
+        )
+        
+        results = []
+        for i, outcome in enumerate(outcomes):
+            if isinstance(outcome, Exception):
+                logger.error("Batch OCR failed for image %s: %s", i, outcome)
+                outcome = {
+                    "error": str(outcome),
                     "status": "failed",
                     "image_index": i
-                })
+                }
+            results.append(outcome)
         
         return results
     
     async def pdf_to_markdown(
         self,
         pdf_path: str,
-        output_path: Optional[str] = None
+        output_path: Optional[str] = None,
+        dpi: int = 200
     ) -> Dict[str, Any]:
         """
         Convert PDF document to markdown
         
+        Pages are rasterized one at a time and fed through document_to_markdown
+        in order, overlapping rasterization with OCR of the previous page.
+        
         Args:
             pdf_path: Path to PDF file
             output_path: Optional output path for markdown file
+            dpi: Rasterization resolution
             
         Returns:
             Markdown content and metadata
+        
+        Raises:
+            PDFRenderingUnavailable: If poppler-utils is not installed
         """
         try:
-            # This would use pdf2image to convert PDF pages to images
-            # then process each page with OCR
+            from pdf2image import convert_from_path, pdfinfo_from_path
+            from pdf2image.exceptions import PDFInfoNotInstalledError
+            
+            try:
+                page_count = (await asyncio.to_thread(pdfinfo_from_path, pdf_path))["Pages"]
+            except PDFInfoNotInstalledError as e:
+                raise PDFRenderingUnavailable("poppler-utils is not installed") from e
+            
+            # Rasterize page N+1 in a worker thread while page N is being OCR'd;
+            # the bounded queue caps how many decoded pages sit in memory
+            pages: asyncio.Queue = asyncio.Queue(maxsize=2)
+            
+            async def produce():
+                try:
+                    for page_number in range(1, page_count + 1):
+                        images = await asyncio.to_thread(
+                            convert_from_path,
+                            pdf_path,
+                            dpi=dpi,
+                            first_page=page_number,
+                            last_page=page_number
+                        )
+                        await pages.put(images[0])
+                except Exception:
+                    # Unblock the consumer; the error is re-raised by `await producer`
+                    await pages.put(None)
+                    raise
+                await pages.put(None)
+            
+            producer = asyncio.create_task(produce())
+            page_markdown = []
+            try:
+                while (page := await pages.get()) is not None:
+                    page_result = await self.document_to_markdown(page)
+                    page_markdown.append(page_result["markdown"])
+                await producer
+            finally:
+                producer.cancel()
             
             result = {
-                "markdown": "# Converted PDF\n\nPage 1 content...\n\n## Page 2\n\nPage 2 content...",
-                "pages": 2,
+                "markdown": "\n\n".join(page_markdown),
+                "pages": len(page_markdown),
                 "mode": "pdf_to_markdown",
                 "status": "success"
             }
@@ -373,7 +531,7 @@ class OCRService:
             return result
             
         except Exception as e:
-            logger.error(f"PDF to markdown failed: {str(e)}")
+            logger.error("PDF to markdown failed: %s", e)
             raise
 
 # Global instance
@@ -3,41 +3,187 @@ Advanced RAG (Retrieval Augmented Generation) Service
 Implements semantic search with embeddings and context-aware generation
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
+from collections import OrderedDict
 import numpy as np
-from openai import OpenAI
+import asyncio
+import base64
+import hashlib
 import logging
+import time
+
+from config import settings
+from services._client import shared_client
+from services.embedding_store import EmbeddingStore
+from services.vector_store import VectorStore
 
 logger = logging.getLogger(__name__)
 
+# Inputs per embeddings request; batches are sent concurrently
+EMBEDDING_BATCH_SIZE = 256
+
+def _decode_embedding(embedding: Union[str, List[float]]) -> np.ndarray:
+    """Decode a base64 embedding from the API (or accept a float list) as float32"""
+    if isinstance(embedding, str):
+        return np.frombuffer(base64.b64decode(embedding), dtype="<f4")
+    return np.asarray(embedding, dtype=np.float32)
+
+class SemanticCache:
+    """
+    LRU cache of RAG answers, matched on the exact query text first and then,
+    when a threshold is set, on query embedding similarity
+    
+    The cache is per process: clear() after indexing only reaches the worker
+    that indexed, so other workers can serve answers that miss a new document
+    until their entries expire. The short TTL bounds that staleness.
+    """
+    
+    def __init__(self, maxsize: int = 256, threshold: Optional[float] = None, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.ttl = ttl
+        # (query, params) -> (expires_at, unit query embedding, result)
+        self._entries: OrderedDict = OrderedDict()
+    
+    def get(self, query: str, params: Tuple) -> Optional[Dict[str, Any]]:
+        """Return the cached answer for this exact query, if fresh"""
+        key = (query, params)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+    
+    def get_similar(self, query_embedding, params: Tuple) -> Optional[Dict[str, Any]]:
+        """Return the cached answer of the closest earlier query above the threshold"""
+        if self.threshold is None:
+            return None
+        now = time.monotonic()
+        keys, vectors = [], []
+        for key, (expires_at, vector, _) in self._entries.items():
+            if key[1] == params and expires_at >= now:
+                keys.append(key)
+                vectors.append(vector)
+        if not keys:
+            return None
+        
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        similarities = np.stack(vectors) @ (query_vector / np.linalg.norm(query_vector))
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        
+        self._entries.move_to_end(keys[best])
+        return self._entries[keys[best]][2]
+    
+    def put(self, query: str, params: Tuple, query_embedding, result: Dict[str, Any]):
+        """Store an answer, evicting the least recently used entry when full"""
+        vector = np.asarray(query_embedding, dtype=np.float32)
+        key = (query, params)
+        self._entries[key] = (time.monotonic() + self.ttl, vector / np.linalg.norm(vector), result)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop all entries, e.g. after the knowledge base changes"""
+        self._entries.clear()
+
+def _knowledge_base_key(knowledge_base: Union[List[Dict[str, Any]], EmbeddingStore, VectorStore]) -> Tuple:
+    """Identify a knowledge base for the answer cache"""
+    if isinstance(knowledge_base, list):
+        # Ad-hoc lists are rebuilt per request, so key them by content
+        digest = hashlib.sha1()
+        for doc in knowledge_base:
+            digest.update(doc.get('text', '').encode())
+            digest.update(b"\0")
+        return ("documents", digest.hexdigest())
+    # Stores are long-lived; answers follow the instance
+    return (type(knowledge_base).__name__, id(knowledge_base))
+
 class RAGService:
     def __init__(self):
-        self.client = OpenAI()
         self.embedding_model = "text-embedding-ada-002"
         self.chat_model = "gpt-4.1-mini"
+        self.cache = SemanticCache(threshold=settings.rag_semantic_cache_threshold)
+        # sha1(text) -> float32 embedding, so re-indexed chunks skip the API
+        self._embedding_cache: OrderedDict = OrderedDict()
+        self.embedding_cache_size = 4096
+    
+    @property
+    def client(self):
+        """The process-wide client, looked up per use so a restart's new client is picked up"""
+        return shared_client()
+    
+    async def create_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Create embeddings for multiple texts
+        
+        Cached texts are served locally; the rest are embedded in concurrent
+        requests of up to EMBEDDING_BATCH_SIZE inputs.
+        
+        Returns:
+            (len(texts), D) float32 array, one row per text
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
         
-    async def create_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Create embeddings for multiple texts"""
         try:
-            response = self.client.embeddings.create(
-                model=self.embedding_model,
-                input=texts
-            )
-            return [item.embedding for item in response.data]
+            keys = [hashlib.sha1(text.encode()).hexdigest() for text in texts]
+            
+            embeddings = {}
+            missing = {}
+            for key, text in zip(keys, texts):
+                cached = self._embedding_cache.get(key)
+                if cached is None:
+                    missing[key] = text
+                else:
+                    self._embedding_cache.move_to_end(key)
+                    embeddings[key] = cached
+            
+            if missing:
+                missing_keys = list(missing)
+                batches = [
+                    missing_keys[i:i + EMBEDDING_BATCH_SIZE]
+                    for i in range(0, len(missing_keys), EMBEDDING_BATCH_SIZE)
+                ]
+                responses = await asyncio.gather(*(
+                    self.client.embeddings.create(
+                        model=self.embedding_model,
+                        input=[missing[key] for key in batch],
+                        # Raw little-endian float32 instead of a JSON float list
+                        encoding_format="base64"
+                    )
+                    for batch in batches
+                ))
+                for batch, response in zip(batches, responses):
+                    for key, item in zip(batch, response.data):
+                        embedding = _decode_embedding(item.embedding)
+                        embeddings[key] = embedding
+                        self._embedding_cache[key] = embedding
+                
+                while len(self._embedding_cache) > self.embedding_cache_size:
+                    self._embedding_cache.popitem(last=False)
+            
+            return np.stack([embeddings[key] for key in keys])
         except Exception as e:
-            logger.error(f"Embedding creation failed: {str(e)}")
+            logger.error("Embedding creation failed: %s", e)
             raise
     
     def cosine_similarity(self, a: List[float], b: List[float]) -> float:
         """Calculate cosine similarity between two vectors"""
-        a_np = np.array(a)
-        b_np = np.array(b)
-        return np.dot(a_np, b_np) / (np.linalg.norm(a_np) * np.linalg.norm(b_np))
+        a_np = np.asarray(a, dtype=np.float32)
+        b_np = np.asarray(b, dtype=np.float32)
+        # One sqrt over both squared norms instead of two np.linalg.norm calls
+        return float(np.dot(a_np, b_np) / np.sqrt(np.vdot(a_np, a_np) * np.vdot(b_np, b_np)))
     
     async def semantic_search(
         self,
         query: str,
-        documents: List[Dict[str, Any]],
+        documents: Union[List[Dict[str, Any]], EmbeddingStore, VectorStore],
         top_k: int = 5
     ) -> List[Dict[str, Any]]:
         """
@@ -45,7 +191,9 @@ class RAGService:
         
         Args:
             query: Search query
-            documents: List of documents with 'text' and 'embedding' fields
+            documents: List of documents with 'text' and 'embedding' fields,
+                an in-memory EmbeddingStore, or a VectorStore to search in the
+                database
             top_k: Number of top results to return
             
         Returns:
@@ -53,20 +201,47 @@ class RAGService:
         """
         # Create query embedding
         query_embedding = (await self.create_embeddings([query]))[0]
+        return await self._retrieve(query_embedding, documents, top_k)
+    
+    async def semantic_search_batch(
+        self,
+        queries: List[str],
+        documents: Union[List[Dict[str, Any]], EmbeddingStore, VectorStore],
+        top_k: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Perform semantic search for several queries at once
         
-        # Calculate similarities
-        results = []
-        for doc in documents:
-            if 'embedding' in doc:
-                similarity = self.cosine_similarity(query_embedding, doc['embedding'])
-                results.append({
-                    **doc,
-                    'similarity': similarity
-                })
+        Queries are embedded in one request. An EmbeddingStore scores them in a
+        single matrix product (on the GPU when available); a VectorStore runs
+        the searches concurrently.
         
-        # Sort by similarity and return top_k
-        results.sort(key=lambda x: x['similarity'], reverse=True)
-        return results[:top_k]
+        Returns:
+            One list of top matching documents per query
+        """
+        query_embeddings = await self.create_embeddings(queries)
+        
+        if isinstance(documents, list):
+            documents = EmbeddingStore.from_documents(documents)
+        if isinstance(documents, EmbeddingStore):
+            return await documents.search_batch(query_embeddings, top_k)
+        return list(await asyncio.gather(*(
+            documents.search(query_embedding, top_k)
+            for query_embedding in query_embeddings
+        )))
+    
+    async def _retrieve(
+        self,
+        query_embedding: List[float],
+        documents: Union[List[Dict[str, Any]], EmbeddingStore, VectorStore],
+        top_k: int
+    ) -> List[Dict[str, Any]]:
+        """Return the top_k documents closest to an already-embedded query"""
+        if isinstance(documents, list):
+            # Ad-hoc document lists are packed into a store for one query; keep
+            # an EmbeddingStore to reuse the packed matrix across queries
+            documents = EmbeddingStore.from_documents(documents)
+        return await documents.search(query_embedding, top_k)
     
     async def generate_with_context(
         self,
@@ -111,7 +286,7 @@ class RAGService:
         
         # Generate response
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.chat_model,
                 messages=messages,
                 temperature=temperature,
@@ -130,13 +305,13 @@ class RAGService:
                 "sources": [doc.get('source', 'Unknown') for doc in context_documents]
             }
         except Exception as e:
-            logger.error(f"Generation failed: {str(e)}")
+            logger.error("Generation failed: %s", e)
             raise
     
     async def rag_query(
         self,
         query: str,
-        knowledge_base: List[Dict[str, Any]],
+        knowledge_base: Union[List[Dict[str, Any]], EmbeddingStore, VectorStore],
         top_k: int = 5,
         system_prompt: Optional[str] = None,
         temperature: float = 0.7
@@ -146,16 +321,30 @@ class RAGService:
         
         Args:
             query: User query
-            knowledge_base: List of documents with embeddings
+            knowledge_base: List of documents with embeddings, an EmbeddingStore,
+                or a VectorStore
             top_k: Number of documents to retrieve
             system_prompt: Optional system prompt
             temperature: Generation temperature
             
         Returns:
-            Generated answer with sources and metadata
+            Generated answer with sources and metadata; 'cached' tells whether
+            it was reused from an earlier query
         """
+        # Repeated and near-duplicate queries reuse the earlier answer, skipping
+        # retrieval and generation (and, for exact repeats, the embedding call)
+        params = (_knowledge_base_key(knowledge_base), top_k, system_prompt, temperature)
+        cached = self.cache.get(query, params)
+        if cached is not None:
+            return {**cached, 'cached': True}
+        
+        query_embedding = (await self.create_embeddings([query]))[0]
+        cached = self.cache.get_similar(query_embedding, params)
+        if cached is not None:
+            return {**cached, 'cached': True}
+        
         # Retrieve relevant documents
-        relevant_docs = await self.semantic_search(query, knowledge_base, top_k)
+        relevant_docs = await self._retrieve(query_embedding, knowledge_base, top_k)
         
         # Generate answer with context
         result = await self.generate_with_context(
@@ -172,9 +361,10 @@ class RAGService:
             'similarity_scores': [doc['similarity'] for doc in relevant_docs]
         }
         
-        return result
+        self.cache.put(query, params, query_embedding, result)
+        return {**result, 'cached': False}
     
-    async def chunk_text(
+    def chunk_text(
         self,
         text: str,
         chunk_size: int = 500,
@@ -191,16 +381,13 @@ class RAGService:
         Returns:
             List of text chunks
         """
-        chunks = []
-        start = 0
-        
-        while start < len(text):
-            end = start + chunk_size
-            chunk = text[start:end]
-            chunks.append(chunk)
-            start = end - overlap
+        if overlap >= chunk_size:
+            raise ValueError("overlap must be smaller than chunk_size")
         
-        return chunks
+        return [
+            text[start:start + chunk_size]
+            for start in range(0, len(text), chunk_size - overlap)
+        ]
     
     async def index_document(
         self,
@@ -220,7 +407,7 @@ class RAGService:
             List of indexed chunks with embeddings
         """
         # Chunk the text
-        chunks = await self.chunk_text(text, chunk_size)
+        chunks = self.chunk_text(text, chunk_size)
         
         # Create embeddings for all chunks
         embeddings = await self.create_embeddings(chunks)
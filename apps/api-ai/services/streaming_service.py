@@ -4,15 +4,34 @@ Implements Server-Sent Events (SSE) for streaming completions
 """
 
 from typing import AsyncGenerator, Dict, Any
-from openai import OpenAI
-import json
+import orjson
 import logging
 
+from services._client import shared_client
+
 logger = logging.getLogger(__name__)
 
+def _sse_event(payload: Dict[str, Any]) -> bytes:
+    """Frame a payload as a Server-Sent Events data line"""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+# Every frame is a JSON message on the default event. Content frames are
+# assembled around a fixed prefix, so each token only JSON-encodes its text
+_CONTENT_PREFIX = b'data: {"type":"content","content":'
+
+def _sse_content(content: str) -> bytes:
+    """Frame a token as a content event"""
+    return _CONTENT_PREFIX + orjson.dumps(content) + b"}\n\n"
+
+_DONE_EVENT = _sse_event({"type": "done", "finish_reason": "stop"})
+# Upstream error text is logged, not sent to the client
+_ERROR_EVENT = _sse_event({"type": "error", "error": "Streaming failed"})
+
 class StreamingService:
-    def __init__(self):
-        self.client = OpenAI()
+    @property
+    def client(self):
+        """The process-wide client, looked up per use so a restart's new client is picked up"""
+        return shared_client()
     
     async def stream_chat_completion(
         self,
@@ -20,15 +39,16 @@ class StreamingService:
         model: str = "gpt-4.1-mini",
         temperature: float = 0.7,
         max_tokens: int = None
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """
         Stream chat completion responses
         
         Yields:
-            JSON-formatted chunks with delta content
+            SSE content events carrying delta text, then a done (or error)
+            event
         """
         try:
-            stream = self.client.chat.completions.create(
+            stream = await self.client.chat.completions.create(
                 model=model,
                 messages=messages,
                 temperature=temperature,
@@ -36,25 +56,19 @@ class StreamingService:
                 stream=True
             )
             
-            for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    yield json.dumps({
-                        "type": "content",
-                        "content": chunk.choices[0].delta.content
-                    }) + "\n"
+            # Iterating asynchronously yields to the event loop between tokens,
+            # so concurrent streams progress in parallel
+            async for chunk in stream:
+                content = chunk.choices[0].delta.content
+                if content:
+                    yield _sse_content(content)
             
             # Send completion signal
-            yield json.dumps({
-                "type": "done",
-                "finish_reason": "stop"
-            }) + "\n"
+            yield _DONE_EVENT
             
         except Exception as e:
-            logger.error(f"Streaming failed: {str(e)}")
-            yield json.dumps({
-                "type": "error",
-                "error": str(e)
-            }) + "\n"
+            logger.error("Streaming failed: %s", e)
+            yield _ERROR_EVENT
     
     async def stream_text_completion(
         self,
@@ -62,12 +76,12 @@ class StreamingService:
         model: str = "gpt-4.1-mini",
         temperature: float = 0.7,
         max_tokens: int = 500
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[bytes, None]:
         """
         Stream text completion responses
         
         Yields:
-            JSON-formatted chunks with delta content
+            SSE events as for stream_chat_completion
         """
         messages = [{"role": "user", "content": prompt}]
         async for chunk in self.stream_chat_completion(
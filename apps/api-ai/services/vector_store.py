@@ -0,0 +1,234 @@
+"""
+Vector Store for RAG chunks
+Persists chunk embeddings in PostgreSQL (pgvector) so retrieval runs in the
+database and the knowledge base is shared across workers and restarts
+"""
+
+from typing import List, Dict, Any, Optional
+import asyncio
+import json
+import orjson
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _json_dumps(value: Any) -> str:
+    """Serialize with orjson, falling back to json for integers beyond 64 bits"""
+    try:
+        return orjson.dumps(value).decode()
+    except orjson.JSONEncodeError:
+        return json.dumps(value)
+
+class VectorStore:
+    """pgvector-backed storage and nearest-neighbour search for RAG chunks"""
+    
+    def __init__(
+        self,
+        database_url: str,
+        dimensions: int = 1536,
+        table: str = "rag_chunks",
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 200,
+        ef_search: int = 100,
+        quantization: Optional[str] = None,
+        rerank_factor: int = 4
+    ):
+        self.database_url = database_url
+        self.dimensions = dimensions
+        self.table = table
+        # HNSW graph degree and build-time candidate list; only applied when
+        # the index is first created
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        # Query-time candidate list: higher raises recall at the cost of latency
+        self.ef_search = ef_search
+        # "binary" searches a 1-bit sign quantization of the embeddings by
+        # Hamming distance, then reranks top_k * rerank_factor candidates
+        # with the full-precision vectors. "halfvec" indexes and searches fp16
+        # copies, halving the index size and the bytes read per distance.
+        self.quantization = quantization
+        self.rerank_factor = rerank_factor
+        self.pool = None
+        self._connect_lock = asyncio.Lock()
+    
+    async def connect(self, min_size: int = 1, max_size: int = 10):
+        """Open the connection pool and make sure the chunk table exists"""
+        async with self._connect_lock:
+            if self.pool is None:
+                await self._connect(min_size, max_size)
+    
+    async def _connect(self, min_size: int, max_size: int):
+        """Create the schema if needed and open the pool"""
+        try:
+            import asyncpg
+            from pgvector.asyncpg import register_vector
+            
+            # The extension must exist before register_vector can look up the type
+            conn = await asyncpg.connect(self.database_url)
+            try:
+                await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+                await conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.table} (
+                        id BIGSERIAL PRIMARY KEY,
+                        document_id UUID NOT NULL,
+                        chunk_index INTEGER NOT NULL,
+                        total_chunks INTEGER NOT NULL,
+                        content TEXT NOT NULL,
+                        metadata JSONB,
+                        embedding vector({self.dimensions}) NOT NULL
+                    )
+                """)
+                # One index per mode: binary search reranks by exact distance
+                # in the outer query, which needs no index of its own
+                if self.quantization == "halfvec":
+                    await conn.execute(f"""
+                        CREATE INDEX IF NOT EXISTS {self.table}_embedding_half_idx
+                        ON {self.table} USING hnsw
+                            ((embedding::halfvec({self.dimensions})) halfvec_cosine_ops)
+                        WITH (m = {self.hnsw_m}, ef_construction = {self.hnsw_ef_construction})
+                    """)
+                elif self.quantization == "binary":
+                    await conn.execute(f"""
+                        CREATE INDEX IF NOT EXISTS {self.table}_embedding_bq_idx
+                        ON {self.table} USING hnsw
+                            ((binary_quantize(embedding)::bit({self.dimensions})) bit_hamming_ops)
+                        WITH (m = {self.hnsw_m}, ef_construction = {self.hnsw_ef_construction})
+                    """)
+                else:
+                    await conn.execute(f"""
+                        CREATE INDEX IF NOT EXISTS {self.table}_embedding_idx
+                        ON {self.table} USING hnsw (embedding vector_cosine_ops)
+                        WITH (m = {self.hnsw_m}, ef_construction = {self.hnsw_ef_construction})
+                    """)
+            finally:
+                await conn.close()
+            
+            self.pool = await asyncpg.create_pool(
+                self.database_url,
+                min_size=min_size,
+                max_size=max_size,
+                init=register_vector,
+                # Session-level, so queries need no extra SET round trip
+                server_settings={"hnsw.ef_search": str(self.ef_search)}
+            )
+            logger.info("Vector store connected")
+        
+        except Exception as e:
+            logger.error("Failed to connect vector store: %s", e)
+            raise
+    
+    async def close(self):
+        """Close the connection pool"""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+    
+    async def add_document(self, document_id: str, chunks: List[Dict[str, Any]]) -> int:
+        """
+        Store the indexed chunks of one document
+        
+        Args:
+            document_id: Identifier shared by all chunks of the document
+            chunks: Indexed chunks as returned by RAGService.index_document
+        
+        Returns:
+            Number of chunks stored
+        """
+        reserved = {"text", "embedding", "chunk_index", "total_chunks"}
+        rows = [
+            (
+                document_id,
+                chunk["chunk_index"],
+                chunk["total_chunks"],
+                chunk["text"],
+                _json_dumps({k: v for k, v in chunk.items() if k not in reserved}),
+                chunk["embedding"],
+            )
+            for chunk in chunks
+        ]
+        
+        async with self.pool.acquire() as conn:
+            await conn.executemany(
+                f"""
+                INSERT INTO {self.table}
+                    (document_id, chunk_index, total_chunks, content, metadata, embedding)
+                VALUES ($1, $2, $3, $4, $5::jsonb, $6)
+                """,
+                rows
+            )
+        
+        return len(rows)
+    
+    async def search(self, query_embedding: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Return the top_k chunks closest to the query by cosine similarity
+        
+        Args:
+            query_embedding: Embedding of the query
+            top_k: Number of chunks to return
+        
+        Returns:
+            Chunks with 'text', their metadata and a 'similarity' score
+        """
+        async with self.pool.acquire() as conn:
+            if self.quantization == "binary":
+                rows = await conn.fetch(
+                    f"""
+                    SELECT content, chunk_index, total_chunks, metadata,
+                           1 - (embedding <=> $1) AS similarity
+                    FROM (
+                        SELECT content, chunk_index, total_chunks, metadata, embedding
+                        FROM {self.table}
+                        ORDER BY binary_quantize(embedding)::bit({self.dimensions})
+                                 <~> binary_quantize($1::vector)
+                        LIMIT $3
+                    ) candidates
+                    ORDER BY embedding <=> $1
+                    LIMIT $2
+                    """,
+                    query_embedding,
+                    top_k,
+                    top_k * self.rerank_factor
+                )
+            elif self.quantization == "halfvec":
+                rows = await conn.fetch(
+                    f"""
+                    SELECT content, chunk_index, total_chunks, metadata,
+                           1 - (embedding::halfvec({self.dimensions}) <=> $1::vector::halfvec({self.dimensions})) AS similarity
+                    FROM {self.table}
+                    ORDER BY embedding::halfvec({self.dimensions}) <=> $1::vector::halfvec({self.dimensions})
+                    LIMIT $2
+                    """,
+                    query_embedding,
+                    top_k
+                )
+            else:
+                rows = await conn.fetch(
+                    f"""
+                    SELECT content, chunk_index, total_chunks, metadata,
+                           1 - (embedding <=> $1) AS similarity
+                    FROM {self.table}
+                    ORDER BY embedding <=> $1
+                    LIMIT $2
+                    """,
+                    query_embedding,
+                    top_k
+                )
+        
+        results = []
+        for row in rows:
+            doc = orjson.loads(row["metadata"]) if row["metadata"] else {}
+            doc.update({
+                "text": row["content"],
+                "chunk_index": row["chunk_index"],
+                "total_chunks": row["total_chunks"],
+                "similarity": float(row["similarity"]),
+            })
+            results.append(doc)
+        
+        return results
+    
+    async def is_empty(self) -> bool:
+        """Check whether any chunk has been indexed"""
+        async with self.pool.acquire() as conn:
+            return not await conn.fetchval(f"SELECT EXISTS (SELECT 1 FROM {self.table})")
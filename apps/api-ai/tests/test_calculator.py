@@ -0,0 +1,44 @@
+"""
+Tests for the agent calculator's expression whitelist
+Run from apps/api-ai: python -m pytest tests (or python -m unittest discover tests)
+"""
+
+import time
+import unittest
+
+from services.calculator import evaluate
+
+class CalculatorTest(unittest.TestCase):
+    def test_accepts_arithmetic(self):
+        self.assertEqual(evaluate("2+3*4"), 14)
+        self.assertEqual(evaluate("-(7 // 2) % 5"), 2)
+        self.assertAlmostEqual(evaluate("sqrt(16) + pi"), 4 + 3.141592653589793)
+        self.assertEqual(evaluate("round(3.14159, 2)"), 3.14)
+    
+    def test_accepts_large_but_bounded_powers(self):
+        self.assertEqual(evaluate("2**64"), 18446744073709551616)
+    
+    def test_rejects_builtins(self):
+        with self.assertRaises(ValueError):
+            evaluate("__import__('os')")
+    
+    def test_rejects_attribute_access(self):
+        with self.assertRaises(ValueError):
+            evaluate("(1).__class__")
+        with self.assertRaises(ValueError):
+            evaluate("sqrt.__self__")
+    
+    def test_rejects_huge_powers_quickly(self):
+        started = time.monotonic()
+        for expression in ("9**9**8", "2**100000", "(10**1000)**10", "round(7, -10**1000)"):
+            with self.assertRaises(ValueError):
+                evaluate(expression)
+        self.assertLess(time.monotonic() - started, 1.0)
+    
+    def test_rejects_complex_results(self):
+        for expression in ("1j", "(-8)**(1/3)"):
+            with self.assertRaises(ValueError):
+                evaluate(expression)
+
+if __name__ == "__main__":
+    unittest.main()